@@ -0,0 +1,23 @@
+# backend/backfill_rollups.py
+# Rebuilds the access_rollups table from access_logs.
+# Usage: python backfill_rollups.py
+import asyncio
+
+from database import engine, SessionLocal, Base
+from core.analytics import backfill_rollups
+
+
+async def main():
+    # Make sure the rollup table exists on databases created before it was added
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with SessionLocal() as db:
+        processed = await backfill_rollups(db)
+
+    await engine.dispose()
+    print(f"Backfilled rollups from {processed} access log entries.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
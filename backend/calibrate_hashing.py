@@ -0,0 +1,67 @@
+# backend/calibrate_hashing.py
+# Picks the hash cost that lands closest to a target verify latency on this machine.
+# Usage: python calibrate_hashing.py --target-ms 250 [--scheme bcrypt] [--purpose user]
+import argparse
+import time
+
+from core.security import build_crypt_context, HASH_POLICIES
+
+# bcrypt's rounds are a log2 work factor; the other schemes scale linearly
+LOG_ROUNDS_SCHEMES = {"bcrypt": (4, 31)}
+LINEAR_START_ROUNDS = {"pbkdf2_sha256": 10000, "sha256_crypt": 5000, "sha512_crypt": 5000}
+
+SAMPLE_PASSWORD = "calibration-password"
+
+
+def time_verify_ms(scheme: str, rounds: int, samples: int) -> float:
+    """Best-of-N wall time for one verify at the given cost."""
+    context = build_crypt_context(scheme, rounds)
+    hashed = context.hash(SAMPLE_PASSWORD)
+    best = float("inf")
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.verify(SAMPLE_PASSWORD, hashed)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def calibrate(scheme: str, target_ms: float, samples: int):
+    if scheme in LOG_ROUNDS_SCHEMES:
+        low, high = LOG_ROUNDS_SCHEMES[scheme]
+        rounds = low
+        elapsed = time_verify_ms(scheme, rounds, samples)
+        # Each extra round doubles the cost, so stop before overshooting by more than half
+        while rounds < high and elapsed * 2 <= target_ms * 1.5:
+            rounds += 1
+            elapsed = time_verify_ms(scheme, rounds, samples)
+        return rounds, elapsed
+
+    if scheme in LINEAR_START_ROUNDS:
+        base = LINEAR_START_ROUNDS[scheme]
+        base_ms = time_verify_ms(scheme, base, samples)
+        rounds = max(1000, int(base * target_ms / base_ms))
+        return rounds, time_verify_ms(scheme, rounds, samples)
+
+    supported = ", ".join(sorted(list(LOG_ROUNDS_SCHEMES) + list(LINEAR_START_ROUNDS)))
+    raise SystemExit(f"Unsupported scheme '{scheme}'. Choose one of: {supported}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate password hash cost for a target latency.")
+    parser.add_argument("--target-ms", type=float, required=True, help="Desired time per verification")
+    parser.add_argument("--purpose", choices=sorted(HASH_POLICIES), default="user")
+    parser.add_argument("--scheme", help="Defaults to the purpose's configured scheme")
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    scheme = args.scheme or HASH_POLICIES[args.purpose]["scheme"]
+    rounds, elapsed = calibrate(scheme, args.target_ms, args.samples)
+
+    prefix = f"{args.purpose.upper()}_PASSWORD"
+    print(f"{scheme} with {rounds} rounds verifies in ~{elapsed:.1f} ms. Add to .env:")
+    print(f"{prefix}_SCHEME={scheme}")
+    print(f"{prefix}_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
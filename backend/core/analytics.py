@@ -0,0 +1,198 @@
+# backend/core/analytics.py
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from database import dialect_insert, bulk_batch_size
+from models import AccessLog, AccessRollup, ShareLink
+
+GRANULARITIES = ("minute", "hour", "day")
+
+# How many access logs to fetch per round trip while streaming a backfill
+BACKFILL_FETCH_SIZE = 1000
+
+# Window used when a query gives no start, and the widest range allowed,
+# per granularity. Keeps every query to at most a few thousand buckets.
+DEFAULT_WINDOWS = {
+    "minute": timedelta(days=1),
+    "hour": timedelta(days=7),
+    "day": timedelta(days=365),
+}
+MAX_WINDOWS = {
+    "minute": timedelta(days=7),
+    "hour": timedelta(days=90),
+    "day": timedelta(days=5 * 365),
+}
+
+# (share_link_id, vault_item_id, granularity, bucket_start, outcome) -> count
+RollupKey = Tuple[int, int, str, datetime, str]
+
+
+def _as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def truncate_to_bucket(moment: datetime, granularity: str) -> datetime:
+    """Floor a timestamp to the start of its UTC minute/hour/day bucket."""
+    moment = _as_utc(moment)
+
+    if granularity == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def resolve_window(granularity: str, start: Optional[datetime], end: Optional[datetime]):
+    """Fill in a missing start/end and check the range suits the granularity.
+
+    Raises ValueError for an empty range or one wider than MAX_WINDOWS allows.
+    """
+    end = _as_utc(end) if end is not None else datetime.now(timezone.utc)
+    start = _as_utc(start) if start is not None else end - DEFAULT_WINDOWS[granularity]
+
+    if start >= end:
+        raise ValueError("start must be before end")
+    if end - start > MAX_WINDOWS[granularity]:
+        raise ValueError(f"Range too wide for {granularity} buckets (max {MAX_WINDOWS[granularity].days} days)")
+
+    return start, end
+
+
+async def _upsert_rollups(db: AsyncSession, counts: Dict[RollupKey, int], replace: bool = False):
+    """Add the given counts onto existing rollup rows, creating missing ones.
+
+    With `replace`, existing rows are overwritten with the given absolute counts.
+    """
+    rows = [
+        {
+            "share_link_id": share_link_id,
+            "vault_item_id": vault_item_id,
+            "granularity": granularity,
+            "bucket_start": bucket_start,
+            "outcome": outcome,
+            "count": count,
+        }
+        for (share_link_id, vault_item_id, granularity, bucket_start, outcome), count in counts.items()
+    ]
+    if not rows:
+        return
+
+    stmt = dialect_insert(AccessRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["share_link_id", "granularity", "bucket_start", "outcome"],
+        set_={"count": stmt.excluded.count if replace else AccessRollup.count + stmt.excluded.count},
+    )
+    await db.execute(stmt)
+
+
+async def record_access(db: AsyncSession, share_id: int, vault_item_id: int, outcome: str, when: datetime):
+    """Bump the rollup counters for one access attempt.
+
+    Runs inside the caller's transaction so the rollups and the raw AccessLog
+    row are committed (or rolled back) together.
+    """
+    counts = {
+        (share_id, vault_item_id, granularity, truncate_to_bucket(when, granularity), outcome): 1
+        for granularity in GRANULARITIES
+    }
+    await _upsert_rollups(db, counts)
+
+
+async def backfill_rollups(db: AsyncSession) -> int:
+    """Rebuild every rollup row from the raw access_logs table.
+
+    Each link is rebuilt in its own short transaction, so live access logging
+    only ever waits on the link currently being rebuilt. Counts are written as
+    absolute values, so rows created by live writes mid-rebuild are not
+    counted twice. Safe to re-run. Returns the number of logs processed.
+    """
+    result = await db.execute(select(ShareLink.id, ShareLink.vault_item_id).order_by(ShareLink.id))
+    links = result.all()
+    await db.commit()
+
+    processed = 0
+    for share_link_id, vault_item_id in links:
+        processed += await _rebuild_link_rollups(db, share_link_id, vault_item_id)
+
+    return processed
+
+
+async def _rebuild_link_rollups(db: AsyncSession, share_link_id: int, vault_item_id: int) -> int:
+    await db.execute(delete(AccessRollup).where(AccessRollup.share_link_id == share_link_id))
+
+    query = (
+        select(AccessLog.outcome, AccessLog.access_time)
+        .where(AccessLog.share_link_id == share_link_id)
+        .execution_options(yield_per=BACKFILL_FETCH_SIZE)
+    )
+
+    counts: Counter = Counter()
+    processed = 0
+    result = await db.stream(query)
+    async for outcome, access_time in result:
+        for granularity in GRANULARITIES:
+            counts[(share_link_id, vault_item_id, granularity, truncate_to_bucket(access_time, granularity), outcome)] += 1
+        processed += 1
+
+    # Multi-row upserts, sized to the backend's bind parameter limit (6 per row)
+    for batch in _chunks(list(counts.items()), bulk_batch_size(6)):
+        await _upsert_rollups(db, dict(batch), replace=True)
+
+    await db.commit()
+    return processed
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def rollup_query(
+        granularity: str,
+        vault_item_id: Optional[int] = None,
+        share_link_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+):
+    """Per-bucket outcome counts for an item or a single link, as a subquery.
+
+    The filter columns match the rollup indexes, so this is an index range
+    scan over at most (buckets x outcomes) rows regardless of log volume.
+    """
+    query = select(
+        AccessRollup.bucket_start,
+        AccessRollup.outcome,
+        func.sum(AccessRollup.count).label("count"),
+    ).where(AccessRollup.granularity == granularity)
+
+    if share_link_id is not None:
+        query = query.where(AccessRollup.share_link_id == share_link_id)
+    if vault_item_id is not None:
+        query = query.where(AccessRollup.vault_item_id == vault_item_id)
+    if start is not None:
+        query = query.where(AccessRollup.bucket_start >= truncate_to_bucket(start, granularity))
+    if end is not None:
+        query = query.where(AccessRollup.bucket_start < end)
+
+    return query.group_by(AccessRollup.bucket_start, AccessRollup.outcome).subquery()
+
+
+def group_buckets(rows) -> list:
+    """Fold (bucket_start, outcome, count) rows, ordered by bucket, into one entry per bucket."""
+    buckets = []
+    for bucket_start, outcome, count in rows:
+        if not buckets or buckets[-1]["bucket_start"] != bucket_start:
+            buckets.append({"bucket_start": bucket_start, "counts": {}, "total": 0})
+        buckets[-1]["counts"][outcome] = int(count)
+        buckets[-1]["total"] += int(count)
+
+    return buckets
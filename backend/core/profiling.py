@@ -0,0 +1,239 @@
+# backend/core/profiling.py
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import secrets
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+
+from database import engine
+
+load_dotenv()
+
+# --- Config ---
+# Profiling is off unless at least one trigger is configured. When off, the
+# middleware and SQL listeners are never installed, so there is no overhead.
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")           # Admin secret, sent as the X-Profile-Token header
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+PROFILING_ROUTES = [p.strip() for p in os.getenv("PROFILING_ROUTES", "").split(",") if p.strip()]  # e.g. /vault/items/*/logs
+PROFILING_DIR = os.getenv("PROFILING_DIR", "profiles")
+PROFILING_MAX_REPORTS = max(1, int(os.getenv("PROFILING_MAX_REPORTS", 50)))
+PROFILING_TOP_FUNCTIONS = 40
+
+PROFILE_HEADER = "X-Profile-Token"
+REPORT_HEADER = "X-Profile-Report"
+
+# The report API itself carries the admin token; profiling it would push real reports out of the ring
+EXCLUDED_PREFIX = "/profiling"
+
+# Keys every stored report has; files missing any are ignored
+REPORT_FIELDS = {
+    "id", "created_at", "method", "path", "status_code", "duration_ms",
+    "trigger", "overlapping_requests", "queries", "query_count", "sql_time_ms", "profile", "profile_note",
+}
+
+# SQL statements captured for the request being profiled, if any
+_current_queries: ContextVar[Optional[List[dict]]] = ContextVar("profiling_queries", default=None)
+
+# Requests seen by the middleware, for spotting profiles mixed with other work.
+# Only touched on the event-loop thread, so plain ints are safe.
+_started_requests = 0
+_in_flight_requests = 0
+
+# Only one cProfile can be active per interpreter, so profiled requests take turns
+_profiler_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return bool(PROFILING_TOKEN or PROFILING_SAMPLE_RATE > 0 or PROFILING_ROUTES)
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    return bool(PROFILING_TOKEN and token and secrets.compare_digest(token, PROFILING_TOKEN))
+
+
+def _profile_trigger(request: Request) -> Optional[str]:
+    """Why this request should be profiled, or None to skip it."""
+    if request.url.path.startswith(EXCLUDED_PREFIX):
+        return None
+    if is_admin_token(request.headers.get(PROFILE_HEADER)):
+        return "header"
+    if any(fnmatch(request.url.path, pattern) for pattern in PROFILING_ROUTES):
+        return "route"
+    if PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE:
+        return "sampling"
+    return None
+
+
+# --- SQL Capture ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_queries.get() is not None:
+        conn.info.setdefault("profiling_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _current_queries.get()
+    if queries is None or not conn.info.get("profiling_start"):
+        return
+    started = conn.info["profiling_start"].pop()
+    queries.append({
+        "statement": statement,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+    })
+
+
+def install_sql_listeners():
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# --- Report Ring ---
+
+def _write_report(report: dict):
+    """Store a report, then drop the oldest ones beyond PROFILING_MAX_REPORTS."""
+    os.makedirs(PROFILING_DIR, exist_ok=True)
+    with open(os.path.join(PROFILING_DIR, f"{report['id']}.json"), "w") as f:
+        json.dump(report, f)
+
+    # Report ids start with a sortable timestamp, so name order is age order
+    for stale in _report_files()[:-PROFILING_MAX_REPORTS]:
+        try:
+            os.remove(os.path.join(PROFILING_DIR, stale))
+        except FileNotFoundError:
+            pass
+
+
+def _report_files() -> List[str]:
+    if not os.path.isdir(PROFILING_DIR):
+        return []
+    return sorted(name for name in os.listdir(PROFILING_DIR) if name.endswith(".json"))
+
+
+def list_reports() -> List[dict]:
+    """Summaries of stored reports, newest first."""
+    summaries = []
+    for name in reversed(_report_files()):
+        report = load_report(name[:-len(".json")])
+        if report is None:
+            continue
+        summaries.append({
+            "id": report["id"],
+            "created_at": report["created_at"],
+            "method": report["method"],
+            "path": report["path"],
+            "status_code": report["status_code"],
+            "duration_ms": report["duration_ms"],
+            "trigger": report["trigger"],
+            "overlapping_requests": report["overlapping_requests"],
+            "query_count": report["query_count"],
+            "sql_time_ms": report["sql_time_ms"],
+        })
+    return summaries
+
+
+def load_report(report_id: str) -> Optional[dict]:
+    # Ids are generated by us; anything else could be a path traversal attempt
+    if os.path.basename(report_id) != report_id:
+        return None
+    try:
+        with open(os.path.join(PROFILING_DIR, f"{report_id}.json")) as f:
+            report = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    # Skip truncated or foreign files like any other unreadable one
+    if not isinstance(report, dict) or not REPORT_FIELDS <= report.keys():
+        return None
+    return report
+
+
+# --- Middleware ---
+
+async def profiling_middleware(request: Request, call_next):
+    global _started_requests, _in_flight_requests
+    _started_requests += 1
+    _in_flight_requests += 1
+    try:
+        trigger = _profile_trigger(request)
+        if trigger is None:
+            return await call_next(request)
+        return await _profile_request(request, call_next, trigger)
+    finally:
+        _in_flight_requests -= 1
+
+
+async def _profile_request(request: Request, call_next, trigger: str):
+    # Everything already running, plus everything started before we finish
+    others_at_start = _in_flight_requests - 1
+    started_before = _started_requests
+
+    # If another request holds the profiler, still capture this one's SQL
+    # (collected per request via the contextvar) and say why the profile is missing.
+    profiler = cProfile.Profile() if _profiler_lock.acquire(blocking=False) else None
+
+    queries: List[dict] = []
+    token = _current_queries.set(queries)
+    started = time.perf_counter()
+
+    # cProfile is per thread, so other requests interleaved on the event loop
+    # during this one also show up in its stats. The report counts them.
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            response = await call_next(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+    finally:
+        _current_queries.reset(token)
+        if profiler is not None:
+            _profiler_lock.release()
+
+    duration_ms = round((time.perf_counter() - started) * 1000, 3)
+    overlapping = others_at_start + (_started_requests - started_before)
+
+    if profiler is not None:
+        stats_output = io.StringIO()
+        pstats.Stats(profiler, stream=stats_output).sort_stats("cumulative").print_stats(PROFILING_TOP_FUNCTIONS)
+        profile = stats_output.getvalue()
+        profile_note = None
+        if overlapping:
+            profile_note = f"{overlapping} other request(s) ran during this one; their Python time is mixed into the profile."
+    else:
+        profile, profile_note = None, "Another request was being profiled; only SQL was captured."
+
+    now = datetime.now(timezone.utc)
+    report = {
+        "id": f"{now.strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}",
+        "created_at": now.isoformat(),
+        "method": request.method,
+        "path": request.url.path,
+        "status_code": response.status_code,
+        "duration_ms": duration_ms,
+        "trigger": trigger,
+        "overlapping_requests": overlapping,
+        "queries": queries,
+        "query_count": len(queries),
+        "sql_time_ms": round(sum(q["duration_ms"] for q in queries), 3),
+        "profile": profile,
+        "profile_note": profile_note,
+    }
+    await run_in_threadpool(_write_report, report)
+
+    response.headers[REPORT_HEADER] = report["id"]
+    return response
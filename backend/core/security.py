@@ -1,16 +1,19 @@
 # backend/core/security.py
 import os
 from datetime import datetime, timedelta
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import BackgroundTasks, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from dotenv import load_dotenv
+from sqlalchemy import update
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Import your database and models to fetch the user
-from database import get_db
+from database import get_db, SessionLocal
 from models import User
 
 load_dotenv()
@@ -20,18 +23,106 @@ SECRET_KEY = os.getenv("SECRET_KEY", "fallback_secret_for_dev")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# --- Password Hash Policies ---
+# Each purpose gets its own scheme and cost so login passwords and share-link
+# passwords can be tuned independently (see calibrate_hashing.py).
+USER_PASSWORD = "user"
+SHARE_PASSWORD = "share"
+
+# Every scheme calibrate_hashing.py can configure. All of them stay in each
+# context (as deprecated) so hashes made before a scheme switch still verify.
+LEGACY_SCHEMES = ["bcrypt", "pbkdf2_sha256", "sha256_crypt", "sha512_crypt"]
+
+HASH_POLICIES = {
+    USER_PASSWORD: {
+        "scheme": os.getenv("USER_PASSWORD_SCHEME", "bcrypt"),
+        "rounds": int(os.getenv("USER_PASSWORD_ROUNDS", 12)),
+    },
+    SHARE_PASSWORD: {
+        "scheme": os.getenv("SHARE_PASSWORD_SCHEME", "bcrypt"),
+        "rounds": int(os.getenv("SHARE_PASSWORD_ROUNDS", 12)),
+    },
+}
+
+
+def build_crypt_context(scheme: str, rounds: int) -> CryptContext:
+    # Pinning min/max to the target cost makes needs_update() flag any hash
+    # made with a different cost, in either direction.
+    schemes = [scheme] + [legacy for legacy in LEGACY_SCHEMES if legacy != scheme]
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        **{
+            f"{scheme}__default_rounds": rounds,
+            f"{scheme}__min_rounds": rounds,
+            f"{scheme}__max_rounds": rounds,
+        },
+    )
+
+
+pwd_contexts = {
+    purpose: build_crypt_context(policy["scheme"], policy["rounds"])
+    for purpose, policy in HASH_POLICIES.items()
+}
 
 # 1. Define the OAuth2 scheme (tells FastAPI where the token comes from)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+def _check_password(context: CryptContext, plain_password, hashed_password):
+    """(matches, is outdated) for one hash. CPU-bound, so run it off the event loop."""
+    try:
+        if not context.verify(plain_password, hashed_password):
+            return False, False
+    except ValueError:
+        # Unknown scheme or malformed hash: a failed login, not a server error
+        return False, False
+    return True, context.needs_update(hashed_password)
+
+
+async def verify_password(
+        plain_password,
+        hashed_password,
+        purpose: str = USER_PASSWORD,
+        background_tasks: Optional[BackgroundTasks] = None,
+        owner=None,
+):
+    """Check a password against its hash.
+
+    If the hash was made under an outdated policy and both `background_tasks`
+    and `owner` (the User or ShareLink row holding the hash) are given, a
+    rehash with the current policy is scheduled to run after the response.
+    The hash check runs in the threadpool so a high cost never stalls other requests.
+    """
+    matches, outdated = await run_in_threadpool(
+        _check_password, pwd_contexts[purpose], plain_password, hashed_password
+    )
+    if not matches:
+        return False
+
+    if background_tasks is not None and owner is not None and outdated:
+        background_tasks.add_task(
+            rehash_password, type(owner), owner.id, plain_password, hashed_password, purpose
+        )
+
+    return True
+
+
+def get_password_hash(password, purpose: str = USER_PASSWORD):
+    return pwd_contexts[purpose].hash(password)
 
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def rehash_password(model, row_id: int, plain_password: str, old_hash: str, purpose: str):
+    """Replace an outdated hash, unless the row's password changed meanwhile."""
+    new_hash = await run_in_threadpool(get_password_hash, plain_password, purpose)
+    async with SessionLocal() as db:
+        await db.execute(
+            update(model)
+            .where(model.id == row_id)
+            .where(model.password_hash == old_hash)
+            .values(password_hash=new_hash)
+        )
+        await db.commit()
 
 
 def create_access_token(data: dict):
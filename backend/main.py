@@ -5,8 +5,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from database import engine, Base
+from core import profiling
 from routers.auth import router as auth_router
 from routers.vault import router as vault_router
+from routers.profiling import router as profiling_router
 
 load_dotenv()
 
@@ -29,8 +31,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Only installed when a trigger is configured, so disabled profiling costs nothing
+if profiling.is_enabled():
+    profiling.install_sql_listeners()
+    app.middleware("http")(profiling.profiling_middleware)
+
 app.include_router(auth_router)
 app.include_router(vault_router)
+app.include_router(profiling_router)
 
 @app.get("/")
 def read_root():
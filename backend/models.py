@@ -1,7 +1,7 @@
 # backend/models.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Index, UniqueConstraint
 from sqlalchemy.sql import func
-from database import Base
+from database import Base, UTCDateTime
 
 class User(Base):
     __tablename__ = "users"
@@ -15,7 +15,7 @@ class VaultItem(Base):
     title = Column(String)
     content = Column(String)  # The "Sensitive text content" [cite: 37]
     owner_id = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(UTCDateTime, server_default=func.now())
 
 class ShareLink(Base):
     __tablename__ = "share_links"
@@ -23,7 +23,7 @@ class ShareLink(Base):
     vault_item_id = Column(Integer, ForeignKey("vault_items.id"))
     token = Column(String, unique=True, index=True) # Unique link identifier
     password_hash = Column(String, nullable=True)   # "Optional access password" [cite: 44]
-    expires_at = Column(DateTime(timezone=True))    # "Expiration time" [cite: 42]
+    expires_at = Column(UTCDateTime)                # "Expiration time" [cite: 42]
     max_views = Column(Integer)                     # "Maximum number of allowed views" [cite: 43]
     current_views = Column(Integer, default=0)
     is_active = Column(Boolean, default=True)
@@ -33,6 +33,26 @@ class AccessLog(Base):
     __tablename__ = "access_logs"
     id = Column(Integer, primary_key=True, index=True)
     share_link_id = Column(Integer, ForeignKey("share_links.id"))
-    access_time = Column(DateTime(timezone=True), server_default=func.now())
+    access_time = Column(UTCDateTime, server_default=func.now())
     outcome = Column(String)  # "allowed" or "denied" [cite: 55]
-    ip_address = Column(String)
\ No newline at end of file
+    ip_address = Column(String)
+
+class AccessRollup(Base):
+    """Pre-aggregated access counts per link, outcome and time bucket.
+
+    Maintained incrementally alongside AccessLog writes (see core/analytics.py)
+    so analytics queries never have to scan the raw log table.
+    """
+    __tablename__ = "access_rollups"
+    id = Column(Integer, primary_key=True)
+    share_link_id = Column(Integer, ForeignKey("share_links.id"), nullable=False)
+    vault_item_id = Column(Integer, ForeignKey("vault_items.id"), nullable=False)  # Denormalized for per-item queries
+    granularity = Column(String, nullable=False)                # "minute", "hour" or "day"
+    bucket_start = Column(UTCDateTime, nullable=False)
+    outcome = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("share_link_id", "granularity", "bucket_start", "outcome", name="uq_access_rollup_bucket"),
+        Index("ix_access_rollups_item_bucket", "vault_item_id", "granularity", "bucket_start"),
+    )
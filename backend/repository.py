@@ -0,0 +1,199 @@
+# backend/repository.py
+# Owner-scoped queries: the ownership check is part of the same statement as
+# the real read or write, instead of a separate "fetch the item first" query.
+#
+# Every function returns (owner_id, payload). The router compares owner_id to
+# the current user: None means the row does not exist (404), a different id
+# means it belongs to someone else (403). Payload is only populated for the
+# owner.
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from database import supports_update_returning
+from models import VaultItem, ShareLink, AccessLog
+from core.analytics import rollup_query, group_buckets
+
+
+async def _item_owner(db: AsyncSession, item_id: int):
+    result = await db.execute(select(VaultItem.owner_id).where(VaultItem.id == item_id))
+    return result.scalar()
+
+
+async def _share_owner(db: AsyncSession, share_id: int):
+    result = await db.execute(
+        select(VaultItem.owner_id)
+        .join(ShareLink, ShareLink.vault_item_id == VaultItem.id)
+        .where(ShareLink.id == share_id)
+        .where(ShareLink.is_deleted == False)
+    )
+    return result.scalar()
+
+
+# --- Reads: the owner predicate lives in the LEFT JOIN condition ---
+# A missing item yields no rows, someone else's item yields a single row with
+# no payload columns, and the owner gets the item's owner_id on every row.
+
+async def get_item_logs(db: AsyncSession, item_id: int, owner_id: int):
+    logs = (
+        select(
+            AccessLog.id,
+            AccessLog.access_time,
+            AccessLog.outcome,
+            AccessLog.ip_address,
+            ShareLink.token,
+            ShareLink.vault_item_id,
+        )
+        .join(ShareLink, AccessLog.share_link_id == ShareLink.id)
+        .where(ShareLink.vault_item_id == item_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(VaultItem.owner_id, logs.c.id, logs.c.token, logs.c.access_time, logs.c.outcome, logs.c.ip_address)
+        .select_from(VaultItem)
+        .outerjoin(logs, and_(logs.c.vault_item_id == VaultItem.id, VaultItem.owner_id == owner_id))
+        .where(VaultItem.id == item_id)
+        .order_by(logs.c.access_time.desc())
+    )
+    rows = result.all()
+
+    if not rows:
+        return None, []
+
+    return rows[0].owner_id, [row for row in rows if row.id is not None]
+
+
+async def get_item_share_links(db: AsyncSession, item_id: int, owner_id: int):
+    result = await db.execute(
+        select(VaultItem.owner_id, ShareLink)
+        .select_from(VaultItem)
+        .outerjoin(ShareLink, and_(
+            ShareLink.vault_item_id == VaultItem.id,
+            ShareLink.is_deleted == False,
+            VaultItem.owner_id == owner_id,
+        ))
+        .where(VaultItem.id == item_id)
+        .order_by(ShareLink.id.desc())
+    )
+    rows = result.all()
+
+    if not rows:
+        return None, []
+
+    return rows[0].owner_id, [link for _, link in rows if link is not None]
+
+
+async def get_item_analytics(
+        db: AsyncSession, item_id: int, owner_id: int, granularity: str,
+        start: Optional[datetime] = None, end: Optional[datetime] = None,
+):
+    buckets = rollup_query(granularity, vault_item_id=item_id, start=start, end=end)
+    result = await db.execute(
+        select(VaultItem.owner_id, buckets.c.bucket_start, buckets.c.outcome, buckets.c.count)
+        .select_from(VaultItem)
+        .outerjoin(buckets, VaultItem.owner_id == owner_id)
+        .where(VaultItem.id == item_id)
+        .order_by(buckets.c.bucket_start)
+    )
+    rows = result.all()
+
+    if not rows:
+        return None, []
+
+    return rows[0].owner_id, group_buckets(row[1:] for row in rows if row.bucket_start is not None)
+
+
+async def get_share_analytics(
+        db: AsyncSession, share_id: int, owner_id: int, granularity: str,
+        start: Optional[datetime] = None, end: Optional[datetime] = None,
+):
+    # Deleted links are still included: like the logs, analytics are historical
+    buckets = rollup_query(granularity, share_link_id=share_id, start=start, end=end)
+    result = await db.execute(
+        select(VaultItem.owner_id, buckets.c.bucket_start, buckets.c.outcome, buckets.c.count)
+        .select_from(ShareLink)
+        .join(VaultItem, ShareLink.vault_item_id == VaultItem.id)
+        .outerjoin(buckets, VaultItem.owner_id == owner_id)
+        .where(ShareLink.id == share_id)
+        .order_by(buckets.c.bucket_start)
+    )
+    rows = result.all()
+
+    if not rows:
+        return None, []
+
+    return rows[0].owner_id, group_buckets(row[1:] for row in rows if row.bucket_start is not None)
+
+
+# --- Writes: UPDATE ... WHERE <owner> RETURNING ---
+# The happy path is one statement. Only when nothing matched do we run a
+# lookup to tell "missing" from "not yours".
+
+async def _update_returning(db: AsyncSession, model, row_id: int, stmt):
+    """Run an owner-scoped UPDATE and return the updated row, or None if nothing matched."""
+    if supports_update_returning():
+        result = await db.execute(stmt.returning(model))
+        return result.scalars().first()
+
+    # Backends without UPDATE ... RETURNING need a follow-up read
+    result = await db.execute(stmt)
+    if result.rowcount == 0:
+        return None
+    result = await db.execute(
+        select(model).where(model.id == row_id).execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def update_item(db: AsyncSession, item_id: int, owner_id: int, values: dict):
+    if not values:
+        result = await db.execute(select(VaultItem).where(VaultItem.id == item_id))
+        item = result.scalars().first()
+        if not item or item.owner_id != owner_id:
+            return (item.owner_id if item else None), None
+        return owner_id, item
+
+    item = await _update_returning(
+        db, VaultItem, item_id,
+        update(VaultItem)
+        .where(VaultItem.id == item_id)
+        .where(VaultItem.owner_id == owner_id)
+        .values(**values)
+    )
+
+    if item is None:
+        return await _item_owner(db, item_id), None
+
+    await db.commit()
+    return owner_id, item
+
+
+async def update_share_link(db: AsyncSession, share_id: int, owner_id: int, values: dict):
+    owned_items = select(VaultItem.id).where(VaultItem.owner_id == owner_id)
+
+    if not values:
+        result = await db.execute(
+            select(ShareLink)
+            .where(ShareLink.id == share_id)
+            .where(ShareLink.is_deleted == False)
+            .where(ShareLink.vault_item_id.in_(owned_items))
+        )
+        share_link = result.scalars().first()
+    else:
+        share_link = await _update_returning(
+            db, ShareLink, share_id,
+            update(ShareLink)
+            .where(ShareLink.id == share_id)
+            .where(ShareLink.is_deleted == False)
+            .where(ShareLink.vault_item_id.in_(owned_items))
+            .values(**values)
+        )
+
+    if share_link is None:
+        return await _share_owner(db, share_id), None
+
+    await db.commit()
+    return owner_id, share_link
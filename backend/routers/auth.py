@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from database import get_db
@@ -34,13 +34,16 @@ async def register(user_data: UserAuth, db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login(user_data: UserAuth, db: AsyncSession = Depends(get_db)):
+async def login(user_data: UserAuth, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
     #Fetch user
     result = await db.execute(select(User).where(User.username == user_data.username))
     user = result.scalars().first()
 
     #Verify credentials
-    if not user or not verify_password(user_data.password, user.password_hash):
+    # Hashes made under an older cost policy are upgraded after the response
+    if not user or not await verify_password(
+            user_data.password, user.password_hash, background_tasks=background_tasks, owner=user
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
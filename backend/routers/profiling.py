@@ -0,0 +1,33 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from schemas import ProfileSummary, ProfileReport
+from core.profiling import is_admin_token, list_reports, load_report
+
+router = APIRouter(
+    prefix="/profiling",
+    tags=["Profiling"]
+)
+
+
+def require_profiling_admin(x_profile_token: Optional[str] = Header(None)):
+    # 404 rather than 401/403 so the endpoints are invisible without the token
+    if not is_admin_token(x_profile_token):
+        raise HTTPException(status_code=404, detail="Not found")
+
+
+@router.get("/reports", response_model=List[ProfileSummary], dependencies=[Depends(require_profiling_admin)])
+async def read_profile_reports():
+    return await run_in_threadpool(list_reports)
+
+
+@router.get("/reports/{report_id}", response_model=ProfileReport, dependencies=[Depends(require_profiling_admin)])
+async def read_profile_report(report_id: str):
+    report = await run_in_threadpool(load_report, report_id)
+
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    return report
@@ -2,10 +2,10 @@ import asyncio
 import os
 import secrets
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Literal, Optional
 from dotenv import load_dotenv
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import func, and_, or_
@@ -18,9 +18,12 @@ from schemas import (
     ShareMetaData, ShareAccessRequest,
     VaultContentResponse, AccessLogResponse,
     VaultItemUpdate, ShareLinkStatus,
-    ShareLinkUpdate, VaultStats
+    ShareLinkUpdate, VaultStats,
+    AccessAnalytics
 )
-from core.security import get_current_user, get_password_hash, verify_password
+from core.security import get_current_user, get_password_hash, verify_password, SHARE_PASSWORD
+from core.analytics import record_access, resolve_window
+import repository
 
 load_dotenv()
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
@@ -81,7 +84,7 @@ async def create_share_link(
     token = secrets.token_urlsafe(16)
 
     # Hash password if provided
-    hashed_pw = get_password_hash(share_data.password) if share_data.password else None
+    hashed_pw = get_password_hash(share_data.password, SHARE_PASSWORD) if share_data.password else None
 
     new_share = ShareLink(
         vault_item_id=share_data.vault_item_id,
@@ -139,6 +142,7 @@ async def access_shared_content(
         token: str,
         req: ShareAccessRequest,
         request: Request,
+        background_tasks: BackgroundTasks,
         db: AsyncSession = Depends(get_db)
 ):
     # FIX: Exclude deleted links
@@ -156,27 +160,30 @@ async def access_shared_content(
 
     # Security Checks
     if not share.is_active:
-        await log_attempt(db, share.id, "denied_revoked", client_ip)
+        await log_attempt(db, share, "denied_revoked", client_ip)
         raise HTTPException(status_code=410, detail="This link has been revoked.")
 
     if share.expires_at < datetime.now(timezone.utc):
-        await log_attempt(db, share.id, "denied_expired", client_ip)
+        await log_attempt(db, share, "denied_expired", client_ip)
         raise HTTPException(status_code=410, detail="This link has expired.")
 
     if share.current_views >= share.max_views:
-        await log_attempt(db, share.id, "denied_view_limit", client_ip)
+        await log_attempt(db, share, "denied_view_limit", client_ip)
         raise HTTPException(status_code=410, detail="View limit reached.")
 
     # Password Check
     if share.password_hash:
-        if not req.password or not verify_password(req.password, share.password_hash):
+        if not req.password or not await verify_password(
+                req.password, share.password_hash, SHARE_PASSWORD,
+                background_tasks=background_tasks, owner=share
+        ):
             await asyncio.sleep(2)
-            await log_attempt(db, share.id, "denied_bad_password", client_ip)
+            await log_attempt(db, share, "denied_bad_password", client_ip)
             raise HTTPException(status_code=401, detail="Incorrect password.")
 
     # Success
     share.current_views += 1
-    await log_attempt(db, share.id, "allowed", client_ip)
+    await log_attempt(db, share, "allowed", client_ip)
     await db.commit()
 
     item_result = await db.execute(select(VaultItem).where(VaultItem.id == share.vault_item_id))
@@ -189,14 +196,18 @@ async def access_shared_content(
 
 
 # --- Helper: Log Attempts ---
-async def log_attempt(db: AsyncSession, share_id: int, outcome: str, ip: str):
+async def log_attempt(db: AsyncSession, share: ShareLink, outcome: str, ip: str):
+    now = datetime.now(timezone.utc)
     new_log = AccessLog(
-        share_link_id=share_id,
+        share_link_id=share.id,
+        access_time=now,
         outcome=outcome,
         ip_address=ip
     )
     db.add(new_log)
     try:
+        # Rollups share the log's transaction so analytics never drift from the raw logs
+        await record_access(db, share.id, share.vault_item_id, outcome, now)
         await db.commit()
     except Exception:
         await db.rollback()
@@ -208,61 +219,106 @@ async def read_item_logs(
         db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(VaultItem).where(VaultItem.id == item_id))
-    item = result.scalars().first()
+    # Logs are historical, so we generally show them even if the link was later deleted.
+    owner_id, rows = await repository.get_item_logs(db, item_id, current_user.id)
 
-    if not item:
+    if owner_id is None:
         raise HTTPException(status_code=404, detail="Vault item not found")
 
-    if item.owner_id != current_user.id:
+    if owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view these logs")
 
-    # Logs are historical, so we generally show them even if the link was later deleted.
-    query = (
-        select(AccessLog, ShareLink.token)
-        .join(ShareLink, AccessLog.share_link_id == ShareLink.id)
-        .where(ShareLink.vault_item_id == item_id)
-        .order_by(AccessLog.access_time.desc())
-    )
-
-    result = await db.execute(query)
-
     logs = []
-    for log_entry, token in result:
+    for row in rows:
         logs.append({
-            "id": log_entry.id,
-            "share_link_token": token,
-            "access_time": log_entry.access_time,
-            "outcome": log_entry.outcome,
-            "ip_address": log_entry.ip_address
+            "id": row.id,
+            "share_link_token": row.token,
+            "access_time": row.access_time,
+            "outcome": row.outcome,
+            "ip_address": row.ip_address
         })
 
     return logs
 
 
-@router.put("/items/{item_id}", response_model=VaultItemResponse)
-async def update_vault_item(
+# --- Analytics: Per-Item Buckets ---
+@router.get("/items/{item_id}/analytics", response_model=AccessAnalytics)
+async def read_item_analytics(
         item_id: int,
-        item_update: VaultItemUpdate,
+        granularity: Literal["minute", "hour", "day"] = "hour",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
         db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(VaultItem).where(VaultItem.id == item_id))
-    item = result.scalars().first()
+    # Defaults to a recent window; wide ranges must use a coarser granularity
+    try:
+        start, end = resolve_window(granularity, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    if not item:
+    owner_id, buckets = await repository.get_item_analytics(
+        db, item_id, current_user.id, granularity, start=start, end=end
+    )
+
+    if owner_id is None:
         raise HTTPException(status_code=404, detail="Vault item not found")
 
-    if item.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to edit this item")
+    if owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to view these analytics")
+
+    return {"granularity": granularity, "buckets": buckets}
+
 
+# --- Analytics: Per-Link Buckets ---
+@router.get("/shares/{share_id}/analytics", response_model=AccessAnalytics)
+async def read_share_analytics(
+        share_id: int,
+        granularity: Literal["minute", "hour", "day"] = "hour",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    # Defaults to a recent window; wide ranges must use a coarser granularity
+    try:
+        start, end = resolve_window(granularity, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    owner_id, buckets = await repository.get_share_analytics(
+        db, share_id, current_user.id, granularity, start=start, end=end
+    )
+
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Link not found")
+
+    if owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    return {"granularity": granularity, "buckets": buckets}
+
+
+@router.put("/items/{item_id}", response_model=VaultItemResponse)
+async def update_vault_item(
+        item_id: int,
+        item_update: VaultItemUpdate,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    values = {}
     if item_update.title is not None:
-        item.title = item_update.title
+        values["title"] = item_update.title
     if item_update.content is not None:
-        item.content = item_update.content
+        values["content"] = item_update.content
 
-    await db.commit()
-    await db.refresh(item)
+    owner_id, item = await repository.update_item(db, item_id, current_user.id, values)
+
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Vault item not found")
+
+    if owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to edit this item")
 
     return item
 
@@ -274,21 +330,12 @@ async def get_item_share_links(
         db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(VaultItem).where(VaultItem.id == item_id))
-    item = result.scalars().first()
+    # Deleted links are filtered out
+    owner_id, links = await repository.get_item_share_links(db, item_id, current_user.id)
 
-    if not item or item.owner_id != current_user.id:
+    if owner_id is None or owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # Filter out deleted links
-    links_result = await db.execute(
-        select(ShareLink)
-        .where(ShareLink.vault_item_id == item_id)
-        .where(ShareLink.is_deleted == False)
-        .order_by(ShareLink.id.desc())
-    )
-    links = links_result.scalars().all()
-
     response_data = []
     now = datetime.now(timezone.utc)
 
@@ -328,31 +375,21 @@ async def update_share_link(
         db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(
-        select(ShareLink, VaultItem)
-        .join(VaultItem, ShareLink.vault_item_id == VaultItem.id)
-        .where(ShareLink.id == share_id)
-        .where(ShareLink.is_deleted == False)
-    )
-    row = result.first()
-
-    if not row:
-        raise HTTPException(status_code=404, detail="Link not found")
-
-    share_link, vault_item = row
-
-    if vault_item.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-
+    values = {}
     if update_data.expires_at is not None:
-        share_link.expires_at = update_data.expires_at
+        values["expires_at"] = update_data.expires_at
     if update_data.max_views is not None:
-        share_link.max_views = update_data.max_views
+        values["max_views"] = update_data.max_views
     if update_data.is_active is not None:
-        share_link.is_active = update_data.is_active
+        values["is_active"] = update_data.is_active
 
-    await db.commit()
-    await db.refresh(share_link)
+    owner_id, share_link = await repository.update_share_link(db, share_id, current_user.id, values)
+
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Link not found")
+
+    if owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
 
     remaining = max(0, share_link.max_views - share_link.current_views)
     now = datetime.now(timezone.utc)
@@ -387,28 +424,15 @@ async def delete_share_link(
         db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    # FIX: Ensure we only delete existing (non-deleted) links
-    result = await db.execute(
-        select(ShareLink, VaultItem)
-        .join(VaultItem, ShareLink.vault_item_id == VaultItem.id)
-        .where(ShareLink.id == share_id)
-        .where(ShareLink.is_deleted == False)
-    )
-    row = result.first()
+    # FIX: Soft delete logic. Only existing (non-deleted) links match.
+    owner_id, _ = await repository.update_share_link(db, share_id, current_user.id, {"is_deleted": True})
 
-    if not row:
+    if owner_id is None:
         raise HTTPException(status_code=404, detail="Link not found")
 
-    share_link, vault_item = row
-
-    if vault_item.owner_id != current_user.id:
+    if owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # FIX: Soft delete logic
-    share_link.is_deleted = True
-
-    await db.commit()
-
     return {"message": "Link deleted successfully"}
 
 
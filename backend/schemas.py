@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Literal
 
 class UserAuth(BaseModel):
     username: str
@@ -95,4 +95,35 @@ class ShareLinkUpdate(BaseModel):
 class VaultStats(BaseModel):
     total_items: int
     active_shares: int
-    total_views: int
\ No newline at end of file
+    total_views: int
+
+class AnalyticsBucket(BaseModel):
+    bucket_start: datetime
+    counts: Dict[str, int]  # outcome -> number of attempts, e.g. {"allowed": 3, "denied_expired": 1}
+    total: int
+
+class AccessAnalytics(BaseModel):
+    granularity: Literal["minute", "hour", "day"]
+    buckets: List[AnalyticsBucket]
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    created_at: datetime
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    trigger: str  # "header", "route" or "sampling"
+    overlapping_requests: int  # Other requests in flight meanwhile; their Python time is in the profile
+    query_count: int
+    sql_time_ms: float
+
+class ProfiledQuery(BaseModel):
+    statement: str
+    duration_ms: float
+
+class ProfileReport(ProfileSummary):
+    queries: List[ProfiledQuery]
+    profile: Optional[str]  # cProfile stats, sorted by cumulative time; None if it could not be captured
+    profile_note: Optional[str]  # Why the profile is missing or may be unreliable
@@ -0,0 +1,94 @@
+# backend/tests/conftest.py
+# Runs the routers against a throwaway file-backed SQLite database.
+import os
+import tempfile
+
+# Must be set before database.py is imported
+_db_dir = tempfile.mkdtemp(prefix="vault-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("USER_PASSWORD_ROUNDS", "4")
+os.environ.setdefault("SHARE_PASSWORD_ROUNDS", "4")
+os.environ["PROFILING_TOKEN"] = "test-profiling-token"
+os.environ["PROFILING_DIR"] = os.path.join(_db_dir, "profiles")
+
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from database import engine, Base
+from main import app
+
+
+@pytest.fixture
+async def client():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+    # Pooled aiosqlite connections are bound to this test's event loop
+    await engine.dispose()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+        self.active = False
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        self.active = True
+        return self
+
+    def __exit__(self, *exc):
+        self.active = False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def queries():
+    """Counts SQL statements executed inside a `with queries:` block."""
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter._record)
+    yield counter
+    event.remove(engine.sync_engine, "before_cursor_execute", counter._record)
+
+
+async def register(client, username, password="secret-password"):
+    response = await client.post("/auth/register", json={"username": username, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def create_item(client, headers, title="Item", content="Secret"):
+    response = await client.post("/vault/items", json={"title": title, "content": content}, headers=headers)
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+async def create_share(client, headers, item_id, max_views=100, password=None):
+    expires_at = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    response = await client.post(
+        "/vault/share",
+        json={"vault_item_id": item_id, "expires_at": expires_at, "max_views": max_views, "password": password},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    return response.json()["share_link"].rsplit("/", 1)[-1]
+
+
+async def share_id_for(client, headers, item_id):
+    response = await client.get(f"/vault/items/{item_id}/shares", headers=headers)
+    return response.json()[0]["id"]
@@ -0,0 +1,90 @@
+# backend/tests/test_analytics.py
+from sqlalchemy import delete, update
+from sqlalchemy.future import select
+
+from conftest import register, create_item, create_share, share_id_for
+from core.analytics import backfill_rollups
+from database import SessionLocal
+from models import AccessRollup
+
+
+async def rollup_counts(share_id, granularity="day"):
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(AccessRollup.outcome, AccessRollup.count)
+            .where(AccessRollup.share_link_id == share_id)
+            .where(AccessRollup.granularity == granularity)
+        )
+        return dict(result.all())
+
+
+async def test_backfill_replaces_rollups_with_log_counts(client):
+    owner = await register(client, "owner")
+    item_id = await create_item(client, owner)
+    token = await create_share(client, owner, item_id, max_views=3)
+    share_id = await share_id_for(client, owner, item_id)
+
+    for _ in range(4):
+        await client.post(f"/vault/shared/{token}/access", json={})
+    expected = {"allowed": 3, "denied_view_limit": 1}
+    assert await rollup_counts(share_id) == expected
+
+    # Corrupt one link's rollups, then rebuild twice: the result must not drift
+    async with SessionLocal() as db:
+        await db.execute(update(AccessRollup).values(count=99))
+        await db.commit()
+
+    async with SessionLocal() as db:
+        assert await backfill_rollups(db) == 4
+    async with SessionLocal() as db:
+        assert await backfill_rollups(db) == 4
+
+    assert await rollup_counts(share_id) == expected
+    assert await rollup_counts(share_id, "minute") == expected
+
+
+async def test_backfill_fills_missing_rollups(client):
+    owner = await register(client, "owner")
+    item_id = await create_item(client, owner)
+    token = await create_share(client, owner, item_id)
+    share_id = await share_id_for(client, owner, item_id)
+    await client.post(f"/vault/shared/{token}/access", json={})
+
+    async with SessionLocal() as db:
+        await db.execute(delete(AccessRollup))
+        await db.commit()
+        await backfill_rollups(db)
+
+    assert await rollup_counts(share_id, "hour") == {"allowed": 1}
+
+
+async def test_analytics_defaults_to_recent_window(client):
+    owner = await register(client, "owner")
+    item_id = await create_item(client, owner)
+    token = await create_share(client, owner, item_id)
+    await client.post(f"/vault/shared/{token}/access", json={})
+
+    response = await client.get(f"/vault/items/{item_id}/analytics?granularity=minute", headers=owner)
+
+    assert response.status_code == 200
+    buckets = response.json()["buckets"]
+    assert len(buckets) == 1
+    assert buckets[0]["counts"] == {"allowed": 1}
+
+
+async def test_analytics_rejects_ranges_too_wide_for_granularity(client):
+    owner = await register(client, "owner")
+    item_id = await create_item(client, owner)
+
+    too_wide = {"granularity": "minute", "start": "2025-01-01T00:00:00Z", "end": "2025-01-09T00:00:00Z"}
+    response = await client.get(f"/vault/items/{item_id}/analytics", params=too_wide, headers=owner)
+    assert response.status_code == 400
+
+    response = await client.get(
+        f"/vault/items/{item_id}/analytics", params={**too_wide, "granularity": "hour"}, headers=owner
+    )
+    assert response.status_code == 200
+
+    backwards = {"granularity": "day", "start": "2025-02-01T00:00:00Z", "end": "2025-01-01T00:00:00Z"}
+    response = await client.get(f"/vault/items/{item_id}/analytics", params=backwards, headers=owner)
+    assert response.status_code == 400
@@ -0,0 +1,112 @@
+# backend/tests/test_ownership_queries.py
+# Every owner operation should cost the current-user lookup plus one
+# statement. The 403/404 paths of writes need one more lookup to tell
+# "missing" from "not yours".
+import pytest
+
+from conftest import register, create_item, create_share, share_id_for
+
+MISSING_ID = 9999
+
+# (method, path template, json body); {item} and {share} are filled in per test
+ITEM_READS = [
+    ("GET", "/vault/items/{item}/logs", None),
+    ("GET", "/vault/items/{item}/analytics", None),
+]
+SHARE_READS = [
+    ("GET", "/vault/shares/{share}/analytics", None),
+]
+ITEM_WRITES = [
+    ("PUT", "/vault/items/{item}", {"title": "Renamed"}),
+]
+SHARE_WRITES = [
+    ("PUT", "/vault/shares/{share}", {"max_views": 5}),
+    ("DELETE", "/vault/shares/{share}", None),
+]
+
+
+@pytest.fixture
+async def setup(client):
+    owner = await register(client, "owner")
+    other = await register(client, "other")
+    item_id = await create_item(client, owner)
+    token = await create_share(client, owner, item_id)
+    share_id = await share_id_for(client, owner, item_id)
+
+    # One allowed access so logs and analytics have rows
+    response = await client.post(f"/vault/shared/{token}/access", json={})
+    assert response.status_code == 200
+
+    return {"owner": owner, "other": other, "item": item_id, "share": share_id}
+
+
+async def call(client, method, path, body, headers):
+    return await client.request(method, path, json=body, headers=headers)
+
+
+@pytest.mark.parametrize("method,path,body", ITEM_READS + SHARE_READS + ITEM_WRITES + SHARE_WRITES)
+async def test_owner_operation_is_one_statement(client, queries, setup, method, path, body):
+    path = path.format(item=setup["item"], share=setup["share"])
+
+    with queries:
+        response = await call(client, method, path, body, setup["owner"])
+
+    assert response.status_code == 200
+    assert queries.count == 2, queries.statements  # user lookup + the operation
+
+
+async def test_owner_share_list_is_one_statement(client, queries, setup):
+    with queries:
+        response = await client.get(f"/vault/items/{setup['item']}/shares", headers=setup["owner"])
+
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert queries.count == 2, queries.statements
+
+
+@pytest.mark.parametrize("method,path,body", ITEM_READS + SHARE_READS)
+async def test_read_rejections_are_one_statement(client, queries, setup, method, path, body):
+    with queries:
+        forbidden = await call(client, method, path.format(item=setup["item"], share=setup["share"]), body, setup["other"])
+    assert forbidden.status_code == 403
+    assert queries.count == 2, queries.statements
+
+    with queries:
+        missing = await call(client, method, path.format(item=MISSING_ID, share=MISSING_ID), body, setup["owner"])
+    assert missing.status_code == 404
+    assert queries.count == 2, queries.statements
+
+
+async def test_share_list_rejections_are_one_statement(client, queries, setup):
+    # This endpoint has always answered 403 for both cases
+    for item_id, headers in ((setup["item"], setup["other"]), (MISSING_ID, setup["owner"])):
+        with queries:
+            response = await client.get(f"/vault/items/{item_id}/shares", headers=headers)
+        assert response.status_code == 403
+        assert queries.count == 2, queries.statements
+
+
+@pytest.mark.parametrize("method,path,body", ITEM_WRITES + SHARE_WRITES)
+async def test_write_rejections_add_one_lookup(client, queries, setup, method, path, body):
+    with queries:
+        forbidden = await call(client, method, path.format(item=setup["item"], share=setup["share"]), body, setup["other"])
+    assert forbidden.status_code == 403
+    assert queries.count == 3, queries.statements  # user lookup + update + owner lookup
+
+    with queries:
+        missing = await call(client, method, path.format(item=MISSING_ID, share=MISSING_ID), body, setup["owner"])
+    assert missing.status_code == 404
+    assert queries.count == 3, queries.statements
+
+
+async def test_rejected_write_changes_nothing(client, setup):
+    response = await client.put(f"/vault/items/{setup['item']}", json={"title": "Hijacked"}, headers=setup["other"])
+    assert response.status_code == 403
+
+    response = await client.delete(f"/vault/shares/{setup['share']}", headers=setup["other"])
+    assert response.status_code == 403
+
+    items = await client.get("/vault/items", headers=setup["owner"])
+    assert items.json()[0]["title"] == "Item"
+    shares = await client.get(f"/vault/items/{setup['item']}/shares", headers=setup["owner"])
+    assert len(shares.json()) == 1
@@ -0,0 +1,106 @@
+# backend/tests/test_profiling.py
+import asyncio
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+from conftest import register
+from core import profiling, security
+
+ADMIN = {"X-Profile-Token": "test-profiling-token"}
+
+
+@pytest.fixture(autouse=True)
+def empty_report_dir():
+    shutil.rmtree(profiling.PROFILING_DIR, ignore_errors=True)
+
+
+async def test_profiled_request_report_can_be_listed_and_fetched(client):
+    user = await register(client, "owner")
+
+    response = await client.get("/vault/stats", headers={**user, **ADMIN})
+    assert response.status_code == 200
+    report_id = response.headers[profiling.REPORT_HEADER]
+
+    report = await client.get(f"/profiling/reports/{report_id}", headers=ADMIN)
+    assert report.status_code == 200
+    body = report.json()
+    assert body["path"] == "/vault/stats"
+    assert body["trigger"] == "header"
+    assert body["query_count"] == len(body["queries"]) > 0
+    assert body["profile"]
+    assert body["overlapping_requests"] == 0
+    assert body["profile_note"] is None
+
+    listing = await client.get("/profiling/reports", headers=ADMIN)
+    assert [r["id"] for r in listing.json()] == [report_id]
+
+
+async def test_report_api_is_not_profiled(client):
+    for _ in range(3):
+        response = await client.get("/profiling/reports", headers=ADMIN)
+        assert response.status_code == 200
+        assert profiling.REPORT_HEADER not in response.headers
+
+    assert (await client.get("/profiling/reports", headers=ADMIN)).json() == []
+
+
+async def test_report_api_needs_token(client):
+    assert (await client.get("/profiling/reports")).status_code == 404
+    assert (await client.get("/profiling/reports", headers={"X-Profile-Token": "wrong"})).status_code == 404
+
+
+async def test_unprofiled_requests_leave_no_report(client):
+    user = await register(client, "owner")
+
+    response = await client.get("/vault/stats", headers=user)
+
+    assert profiling.REPORT_HEADER not in response.headers
+    assert profiling.list_reports() == []
+
+
+async def test_incomplete_report_files_are_skipped(client):
+    os.makedirs(profiling.PROFILING_DIR, exist_ok=True)
+    with open(os.path.join(profiling.PROFILING_DIR, "20250101T000000000000-broken.json"), "w") as f:
+        json.dump({"id": "20250101T000000000000-broken", "path": "/vault/stats"}, f)
+
+    listing = await client.get("/profiling/reports", headers=ADMIN)
+    assert listing.status_code == 200
+    assert listing.json() == []
+
+    report = await client.get("/profiling/reports/20250101T000000000000-broken", headers=ADMIN)
+    assert report.status_code == 404
+
+
+async def test_overlapping_triggered_requests_both_get_reports(client, monkeypatch):
+    user = await register(client, "owner", "pw-123456")
+
+    def slow_check(context, plain_password, hashed_password):
+        time.sleep(0.3)
+        return True, False
+
+    monkeypatch.setattr(security, "_check_password", slow_check)
+
+    # The slow login holds the profiler while the stats request runs
+    login = asyncio.create_task(client.post(
+        "/auth/login", json={"username": "owner", "password": "pw-123456"}, headers=ADMIN
+    ))
+    await asyncio.sleep(0.05)
+    stats = await client.get("/vault/stats", headers={**user, **ADMIN})
+    login = await login
+
+    assert login.status_code == stats.status_code == 200
+    login_report = (await client.get(f"/profiling/reports/{login.headers[profiling.REPORT_HEADER]}", headers=ADMIN)).json()
+    stats_report = (await client.get(f"/profiling/reports/{stats.headers[profiling.REPORT_HEADER]}", headers=ADMIN)).json()
+
+    assert login_report["profile"]
+    assert login_report["overlapping_requests"] == 1
+    assert "1 other request(s)" in login_report["profile_note"]
+    assert stats_report["profile"] is None
+    assert "only SQL" in stats_report["profile_note"]
+    assert stats_report["query_count"] == len(stats_report["queries"]) > 0
+    # Each request's SQL stays in its own report
+    assert all("users" in q["statement"] for q in login_report["queries"])
@@ -0,0 +1,90 @@
+# backend/tests/test_security.py
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from calibrate_hashing import LOG_ROUNDS_SCHEMES, LINEAR_START_ROUNDS
+from conftest import register
+from core.security import LEGACY_SCHEMES, USER_PASSWORD, build_crypt_context, pwd_contexts, verify_password
+from database import SessionLocal
+from models import User
+
+
+def test_calibrator_schemes_stay_verifiable():
+    assert set(LOG_ROUNDS_SCHEMES) | set(LINEAR_START_ROUNDS) <= set(LEGACY_SCHEMES)
+
+
+@pytest.mark.parametrize("scheme", LEGACY_SCHEMES)
+async def test_hashes_from_any_supported_scheme_verify_and_need_update(scheme):
+    rounds = 4 if scheme == "bcrypt" else 1000
+    old_hash = build_crypt_context(scheme, rounds).hash("pw")
+    current = pwd_contexts[USER_PASSWORD]
+
+    assert await verify_password("pw", old_hash)
+    assert not await verify_password("wrong", old_hash)
+    if scheme != "bcrypt":
+        assert current.needs_update(old_hash)
+
+
+@pytest.mark.parametrize("bad_hash", ["not-a-hash", "$argon2id$v=19$m=65536,t=3,p=4$abc$def", ""])
+async def test_unknown_or_malformed_hash_fails_cleanly(bad_hash):
+    assert await verify_password("pw", bad_hash) is False
+
+
+async def test_login_upgrades_hash_from_old_scheme(client):
+    await register(client, "alice", "pw-123456")
+    old_hash = build_crypt_context("pbkdf2_sha256", 1000).hash("pw-123456")
+    async with SessionLocal() as db:
+        await db.execute(update(User).where(User.username == "alice").values(password_hash=old_hash))
+        await db.commit()
+
+    response = await client.post("/auth/login", json={"username": "alice", "password": "pw-123456"})
+    assert response.status_code == 200
+
+    async with SessionLocal() as db:
+        result = await db.execute(select(User.password_hash).where(User.username == "alice"))
+        new_hash = result.scalar()
+    assert new_hash.startswith("$2b$")
+    assert await verify_password("pw-123456", new_hash)
+
+
+async def test_login_with_unverifiable_hash_is_401(client):
+    await register(client, "bob", "pw-123456")
+    async with SessionLocal() as db:
+        await db.execute(update(User).where(User.username == "bob").values(password_hash="garbage"))
+        await db.commit()
+
+    response = await client.post("/auth/login", json={"username": "bob", "password": "pw-123456"})
+    assert response.status_code == 401
+
+
+class SlowContext:
+    """Stands in for a CryptContext tuned to a high cost."""
+    def verify(self, plain_password, hashed_password):
+        time.sleep(0.5)
+        return True
+
+    def needs_update(self, hashed_password):
+        return False
+
+
+async def test_slow_verify_does_not_block_other_requests(client, monkeypatch):
+    await register(client, "carol", "pw-123456")
+    monkeypatch.setitem(pwd_contexts, USER_PASSWORD, SlowContext())
+
+    login = asyncio.create_task(
+        client.post("/auth/login", json={"username": "carol", "password": "pw-123456"})
+    )
+    await asyncio.sleep(0.05)  # Let the login reach the hash check
+
+    started = time.perf_counter()
+    response = await client.get("/")
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert elapsed < 0.25
+    assert not login.done()
+    assert (await login).status_code == 200
@@ -0,0 +1,46 @@
+# backend/tests/test_storage.py
+import asyncio
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from conftest import register, create_item, create_share, share_id_for
+from database import SessionLocal, _throwaway_sqlite_url
+from models import AccessLog, AccessRollup
+
+
+def test_memory_url_becomes_a_private_file():
+    url = _throwaway_sqlite_url("sqlite+aiosqlite:///:memory:")
+    assert ":memory:" not in url
+    assert url.startswith("sqlite+aiosqlite:///") and url.endswith("vault.db")
+    assert _throwaway_sqlite_url("sqlite+aiosqlite:///./vault.db") == "sqlite+aiosqlite:///./vault.db"
+
+
+async def test_concurrent_access_keeps_rollups_in_step_with_logs(client):
+    owner = await register(client, "owner")
+    item_id = await create_item(client, owner)
+    token = await create_share(client, owner, item_id, max_views=20)
+    share_id = await share_id_for(client, owner, item_id)
+
+    responses = await asyncio.gather(*(
+        client.post(f"/vault/shared/{token}/access", json={}) for _ in range(30)
+    ))
+    assert all(r.status_code in (200, 410) for r in responses)
+
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(AccessLog.outcome, func.count())
+            .where(AccessLog.share_link_id == share_id)
+            .group_by(AccessLog.outcome)
+        )
+        logged = dict(result.all())
+
+        assert sum(logged.values()) == 30
+        for granularity in ("minute", "hour", "day"):
+            result = await db.execute(
+                select(AccessRollup.outcome, func.sum(AccessRollup.count))
+                .where(AccessRollup.share_link_id == share_id)
+                .where(AccessRollup.granularity == granularity)
+                .group_by(AccessRollup.outcome)
+            )
+            assert dict(result.all()) == logged, granularity